@@ -2,19 +2,64 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import os
+import shutil
+import subprocess
+import sys
+
 import nox
 
 nox.options.sessions = ["test"]
+nox.options.default_venv_backend = "uv|virtualenv"
+
+PYTHON_VERSIONS = ["3.10", "3.11", "3.12", "3.13"]
 
 
-@nox.session(python=["3.9", "3.10", "3.11", "3.12"])
+@nox.session(python=PYTHON_VERSIONS)
 def test(session):
-    session.install(".[testing]")
-    session.run("pytest")
+    session.install("-e", ".[testing]")
+    session.run("pytest", "-n", "auto", "--dist", "loadfile")
+
+
+@nox.session(python=False)
+def parallel_test(session):
+    # Run the test session for every Python version concurrently. Each child
+    # gets its own envdir (to avoid venv creation races) and its own range of
+    # mock server ports (to avoid collisions between the test runs).
+    def nox_cmd(version, *args):
+        return [
+            sys.executable,
+            "-m",
+            "nox",
+            "-s",
+            f"test-{version}",
+            "--envdir",
+            f".nox/parallel-{version}",
+            *args,
+        ]
+
+    # Editable installs write into the shared source tree (_version.py,
+    # egg-info), so install one environment at a time before any tests run.
+    for version in PYTHON_VERSIONS:
+        session.run(*nox_cmd(version, "--install-only"), external=True)
+
+    procs = []
+    for i, version in enumerate(PYTHON_VERSIONS):
+        env = dict(os.environ, CJDK_TEST_PORT=str(5000 + 100 * i))
+        cmd = nox_cmd(version, "-R")  # Reuse the venv; skip installation
+        procs.append((version, subprocess.Popen(cmd, env=env)))
+    failed = [version for version, p in procs if p.wait() != 0]
+    if failed:
+        session.error(f"Tests failed for Python {', '.join(failed)}")
 
 
 @nox.session
 def docs(session):
-    session.install(".")
+    # The build directory (including the Jupyter cache of notebook outputs)
+    # is kept between runs for incremental builds; pass '-- --clean' to
+    # start from scratch.
+    if "--clean" in session.posargs:
+        shutil.rmtree("docs/_build", ignore_errors=True)
+    session.install("-e", ".")
     session.install("-r", "docs/requirements.txt")
     session.run("jb", "build", "docs/", env={"CJDK_HIDE_PROGRESS_BARS": "1"})
@@ -2,15 +2,6 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
-from ._api import (
-    cache_file,
-    cache_jdk,
-    cache_package,
-    java_env,
-    java_home,
-    list_jdks,
-    list_vendors,
-)
 from ._version import __version__ as __version__
 
 __all__ = [
@@ -22,3 +13,17 @@ __all__ = [
     "list_jdks",
     "list_vendors",
 ]
+
+
+# The API functions are imported on first access (PEP 562), so that importing
+# cjdk does not import requests, progressbar, etc. until they are needed.
+def __getattr__(name):
+    if name in __all__:
+        from . import _api
+
+        return getattr(_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -8,7 +8,7 @@ import sys
 
 import click
 
-from . import __version__, _api
+from . import __version__
 
 __all__ = [
     "main",
@@ -70,6 +70,8 @@ def ls_vendors(ctx):
     """
     Print the list of available JDK vendors.
     """
+    from . import _api
+
     vendors = _api.list_vendors(**ctx.obj)
     if vendors:
         print("\n".join(vendors))
@@ -88,6 +90,8 @@ def ls(ctx, cached: bool = False):
 
     See 'cjdk --help' for the common options used to specify the criteria.
     """
+    from . import _api
+
     jdks = _api.list_jdks(**ctx.obj, cached_only=cached)
     if jdks:
         print("\n".join(jdks))
@@ -106,6 +110,8 @@ def cache(ctx):
     See 'cjdk --help' for the common options used to specify the JDK and how it
     is obtained.
     """
+    from . import _api
+
     _api.cache_jdk(**ctx.obj)
 
 
@@ -115,6 +121,8 @@ def cache_jdk(ctx):
     """
     Deprecated. Use cache function instead.
     """
+    from . import _api
+
     _api.cache_jdk(**ctx.obj)
 
 
@@ -132,6 +140,8 @@ def java_home(ctx):
     See 'cjdk --help' for the common options used to specify the JDK and how it
     is obtained.
     """
+    from . import _api
+
     print(_api.java_home(**ctx.obj))
 
 
@@ -153,13 +163,19 @@ def exec(ctx, prog, args):
 
     Pass '--' before PROG to prevent any of ARGS to be interpreted by cjdk.
     """
-    with _api.java_env(**ctx.obj):
-        # os.exec*() do not work well on Windows
-        if sys.platform == "win32":
-            r = subprocess.run((prog,) + tuple(args))
-            sys.exit(r.returncode)
-        else:
-            os.execvp(prog, (prog,) + tuple(args))
+    from . import _api
+
+    argv = (prog, *args)
+    # os.exec*() do not work well on Windows
+    if sys.platform == "win32":
+        with _api.java_env(**ctx.obj):
+            sys.exit(subprocess.call(argv))
+    else:
+        # No need to set (and later restore) our own environment; PROG is
+        # looked up on the PATH of the environment passed.
+        home = _api.java_home(**ctx.obj)
+        env = {**os.environ, **_api._java_env_vars(home, add_bin=True)}
+        os.execvpe(prog, argv, env)
 
 
 @click.command(short_help="Cache an arbitrary file.")
@@ -200,6 +216,8 @@ def cache_file(ctx, url, filename, name, ttl, sha1, sha256, sha512):
     See 'cjdk --help' for the common options (JDK-specific options are
     ignored).
     """
+    from . import _api
+
     print(
         _api.cache_file(
             name if name else "file",
@@ -247,6 +265,8 @@ def cache_package(ctx, url, name, sha1, sha256, sha512):
     See 'cjdk --help' for the common options (JDK-specific options are
     ignored).
     """
+    from . import _api
+
     print(
         _api.cache_package(
             name if name else "package",
@@ -2,7 +2,7 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
-import hashlib
+import dataclasses
 import os
 from contextlib import contextmanager
 
@@ -153,15 +153,8 @@ def java_env(*, vendor=None, version=None, add_bin=True, **kwargs):
         parameters. Its value is the JDK home directory.
     """
     home = java_home(vendor=vendor, version=version, **kwargs)
-    with _env_var_set("JAVA_HOME", str(home)):
-        if add_bin:
-            path = (
-                str(home / "bin") + os.pathsep + os.environ.get("PATH", None)
-            )
-            with _env_var_set("PATH", path):
-                yield home
-        else:
-            yield home
+    with _env_vars_set(_java_env_vars(home, add_bin)):
+        yield home
 
 
 def cache_file(name, url, filename, **kwargs):
@@ -196,13 +189,13 @@ def cache_file(name, url, filename, **kwargs):
 
     Notes
     -----
-    The check for SHA-1/SHA-256/SHA-512 hashes is only performed after a
+    The check for SHA-1/SHA-256/SHA-512 hashes is only performed during a
     download; it is not performed if the file already exists in the cache.
     """
     ttl = kwargs.pop("ttl", None)
     if ttl is None:
-        ttl = 2**63
-    check_hashes = _make_hash_checker(kwargs)
+        ttl = _cache._FOREVER
+    hashes = _pop_hashes(kwargs)
     conf = _conf.configure(**kwargs)
 
     return _install.install_file(
@@ -212,7 +205,7 @@ def cache_file(name, url, filename, **kwargs):
         filename,
         conf,
         ttl=ttl,
-        checkfunc=check_hashes,
+        hashes=hashes,
     )
 
 
@@ -246,25 +239,27 @@ def cache_package(name, url, **kwargs):
     Notes
     -----
     The check for SHA-1/SHA-256/SHA-512 hashes is only performed (on the
-    unextracted archive) after a download; it is not performed if the directory
-    already exists in the cache.
+    unextracted archive) during a download; it is not performed if the
+    directory already exists in the cache.
     """
-    check_hashes = _make_hash_checker(kwargs)
+    hashes = _pop_hashes(kwargs)
     conf = _conf.configure(**kwargs)
 
-    return _install.install_dir(
-        "misc-dirs", name, url, conf, checkfunc=check_hashes
-    )
+    return _install.install_dir("misc-dirs", name, url, conf, hashes=hashes)
 
 
 def _get_vendors(**kwargs):
     conf = _conf.configure(**kwargs)
     index = _index.jdk_index(conf)
+    return _index_vendors(index)
+
+
+def _index_vendors(index):
     return {
-        vendor.replace("jdk@", "")
-        for osys in index
-        for arch in index[osys]
-        for vendor in index[osys][arch]
+        vendor.removeprefix("jdk@")
+        for arches in index.values()
+        for vendors in arches.values()
+        for vendor in vendors
     }
 
 
@@ -275,51 +270,47 @@ def _get_jdks(*, vendor=None, version=None, cached_only=True, **kwargs):
         fallback_to_default_vendor=False,
         **kwargs,
     )
+    index = _index.jdk_index(conf)
+    # Keys of the cached JDKs, listed with a single scandir() (rather than
+    # checking each candidate separately) and shared across vendors.
+    cached_keys = (
+        _cached_keys(conf.cache_dir, _jdk._JDK_KEY_PREFIX)
+        if cached_only
+        else None
+    )
     if conf.vendor is None:
-        # Search across all vendors.
-        kwargs.pop("jdk", None)  # It was already parsed.
+        # Search across all vendors, loading the index only once.
         return [
             jdk
-            for v in sorted(_get_vendors())
-            for jdk in _get_jdks(
-                vendor=v,
-                version=conf.version,
-                cached_only=cached_only,
-                **kwargs,
+            for v in sorted(_index_vendors(index))
+            for jdk in _get_vendor_jdks(
+                index, dataclasses.replace(conf, vendor=v), cached_keys
             )
         ]
-    index = _index.jdk_index(conf)
+    return _get_vendor_jdks(index, conf, cached_keys)
+
+
+def _get_vendor_jdks(index, conf, cached_keys):
+    # If cached_keys is not None, list only JDKs whose key is in it.
     jdks = _index.available_jdks(index, conf)
     versions = _index._get_versions(jdks, conf)
     matched = _index._match_versions(conf.vendor, versions, conf.version)
 
-    if cached_only:
-        # Filter matches by existing key directories.
+    if cached_keys is not None and matched:
+        urls = _index.jdk_urls(index, conf)
+
         def is_cached(v):
-            url = _index.jdk_url(index, conf, v)
-            key = (_jdk._JDK_KEY_PREFIX, _cache._key_for_url(url))
-            keydir = _cache._key_directory(conf.cache_dir, key)
-            return keydir.exists()
+            return _cache._key_for_url(urls[v]) in cached_keys
 
         matched = {k: v for k, v in matched.items() if is_cached(v)}
 
-    class VersionElement:
-        def __init__(self, value):
-            self.value = value
-            self.is_int = isinstance(value, int)
-
-        def __eq__(self, other):
-            if self.is_int and other.is_int:
-                return self.value == other.value
-            return str(self.value) == str(other.value)
-
-        def __lt__(self, other):
-            if self.is_int and other.is_int:
-                return self.value < other.value
-            return str(self.value) < str(other.value)
-
-    def version_key(version_tuple):
-        return tuple(VersionElement(elem) for elem in version_tuple[0])
+    def version_key(item):
+        # Integer elements sort numerically and before any string elements,
+        # which sort lexically.
+        return tuple(
+            (0, elem) if isinstance(elem, int) else (1, elem)
+            for elem in item[0]
+        )
 
     return [
         f"{conf.vendor}:{v}"
@@ -327,37 +318,54 @@ def _get_jdks(*, vendor=None, version=None, cached_only=True, **kwargs):
     ]
 
 
-def _make_hash_checker(hashes):
-    checks = [
-        (hashes.pop("sha1", None), hashlib.sha1),
-        (hashes.pop("sha256", None), hashlib.sha256),
-        (hashes.pop("sha512", None), hashlib.sha512),
-    ]
-
-    def check(filepath):
-        for hash, hasher in checks:
-            if hash:
-                hasher = hasher()
-                with open(filepath, "rb") as infile:
-                    while True:
-                        bytes = infile.read(16384)
-                        if not len(bytes):
-                            break
-                        hasher.update(bytes)
-                if hasher.hexdigest().lower() != hash.lower():
-                    raise ValueError("Hash does not match")
-
-    return check
+def _cached_keys(cache_dir, prefix):
+    prefix_dir = _cache._key_directory(cache_dir, (prefix,))
+    try:
+        with os.scandir(prefix_dir) as entries:
+            return {entry.name for entry in entries if entry.is_dir()}
+    except FileNotFoundError:
+        return set()
+
+
+def _java_env_vars(home, add_bin):
+    # Return the environment variables to set (relative to the current
+    # os.environ) for the JDK at home.
+    home_str = os.fspath(home)
+    env = {"JAVA_HOME": home_str}
+    if add_bin:
+        path = home_str + os.sep + "bin"
+        old_path = os.environ.get("PATH", None)
+        if old_path:
+            # Avoid an empty trailing entry, which would mean the current
+            # directory.
+            path = f"{path}{os.pathsep}{old_path}"
+        env["PATH"] = path
+    return env
+
+
+def _pop_hashes(kwargs):
+    # Return dict of hashlib algorithm name to expected digest (bytes). Parsing
+    # the hex here also rejects malformed hashes before any download.
+    hashes = {}
+    for algo in ("sha1", "sha256", "sha512"):
+        hash = kwargs.pop(algo, None)
+        if hash:
+            try:
+                hashes[algo] = bytes.fromhex(hash)
+            except ValueError as err:
+                raise ValueError(f"Invalid {algo} hash: {hash!r}") from err
+    return hashes
 
 
 @contextmanager
-def _env_var_set(name, value):
-    old_value = os.environ.get(name, None)
-    os.environ[name] = value
+def _env_vars_set(values):
+    old_values = {name: os.environ.get(name, None) for name in values}
+    os.environ.update(values)
     try:
         yield
     finally:
-        if old_value:
-            os.environ[name] = old_value
-        else:
-            del os.environ[name]
+        for name, old_value in old_values.items():
+            if old_value is None:
+                del os.environ[name]
+            else:
+                os.environ[name] = old_value
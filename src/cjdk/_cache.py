@@ -2,12 +2,18 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import functools
 import hashlib
+import os
+import re
 import shutil
+import stat
+import sys
 import time
-import urllib
+import uuid
 from contextlib import contextmanager
 from pathlib import Path
+from urllib.parse import quote, unquote, urlparse
 
 from . import _progress
 
@@ -16,19 +22,39 @@ __all__ = [
     "permanent_directory",
 ]
 
+# A TTL that never expires.
+_FOREVER = 2**63
 
+# Characters left unencoded when normalizing URL components for cache keys.
+_QUOTE_SAFE = "+-._"
+
+# Joined URL components that re-encoding would leave unchanged: no percent
+# escapes, only characters that quote() never encodes (plus the separator).
+_NORMALIZED_PATTERN = re.compile(r"[A-Za-z0-9_.~+/-]*")
+
+
+@functools.lru_cache(maxsize=256)
 def _key_for_url(url):
     """
     Return a cache key suitable to cache content retrieved from the given URL.
     """
     if not isinstance(url, tuple):
-        url = urllib.parse.urlparse(url, allow_fragments=False)
+        url = urlparse(url, allow_fragments=False)
     if url.params or url.query or url.fragment:
         raise ValueError(
             f"URL should not have parameters, query, or fragment: {url}"
         )
     items = (url.netloc,) + tuple(url.path.strip("/").split("/"))
+    normalized = "/".join(items)
+    if not _NORMALIZED_PATTERN.fullmatch(normalized):
+        normalized = _percent_reencode_all(items)
+
+    hasher = hashlib.sha1(usedforsecurity=False)
+    hasher.update(normalized.encode("ascii"))
+    return hasher.hexdigest().lower()
+
 
+def _percent_reencode(item):
     # Sometimes URL components contain percent-encoded characters. While this
     # is not usually an issue for file naming, let's normalize by decoding and
     # re-encoding only problem characters.
@@ -38,15 +64,19 @@ def _key_for_url(url):
     # And urllib never encodes - . _ ~
     # In practice, this usually serves only to normalize '+' and the case of
     # percent encoding hex digits.
-    def percent_reencode(item):
-        decoded = urllib.parse.unquote(item, errors="strict")
-        return urllib.parse.quote(decoded, safe="+-._", errors="strict")
+    decoded = unquote(item, errors="strict")
+    return quote(decoded, safe=_QUOTE_SAFE, errors="strict")
 
-    normalized = "/".join(percent_reencode(i) for i in items)
 
-    hasher = hashlib.sha1(usedforsecurity=False)
-    hasher.update(normalized.encode())
-    return hasher.hexdigest().lower()
+def _percent_reencode_all(items):
+    # Re-encode all components in a single unquote/quote pass, using NUL as the
+    # separator. If a component itself contains or decodes to NUL, fall back to
+    # re-encoding each component separately.
+    joined = unquote("\x00".join(items), errors="strict")
+    if joined.count("\x00") != len(items) - 1:
+        return "/".join(map(_percent_reencode, items))
+    quoted = quote(joined, safe=_QUOTE_SAFE + "\x00", errors="strict")
+    return quoted.replace("\x00", "/")
 
 
 def atomic_file(
@@ -79,12 +109,12 @@ def atomic_file(
         cache_dir = Path(cache_dir)
 
     key = (prefix, _key_for_url(key_url))
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
     keydir = _key_directory(cache_dir, key)
     target = keydir / filename
     if not _file_exists_and_is_fresh(target, ttl):
-        with _create_key_tmpdir(cache_dir, key) as tmpdir:
+        # Parent directories are created as needed when fetching.
+        keytmpdir = _key_tmpdir(cache_dir, key)
+        with _create_key_tmpdir(keytmpdir) as tmpdir:
             if tmpdir:
                 fetchfunc(tmpdir / filename)
                 _swap_in_fetched_file(
@@ -95,10 +125,10 @@ def atomic_file(
                 _add_url_file(keydir, key_url)
             else:  # Somebody else is currently fetching
                 _wait_for_dir_to_vanish(
-                    _key_tmpdir(cache_dir, key),
+                    keytmpdir,
                     timeout=timeout_for_fetch_elsewhere,
                 )
-                if not _file_exists_and_is_fresh(target, ttl=2**63):
+                if not _file_exists_and_is_fresh(target, ttl=_FOREVER):
                     raise Exception(
                         f"Fetching of file {target} appears to have been completed elsewhere, but file does not exist"
                     )
@@ -129,21 +159,21 @@ def permanent_directory(
         cache_dir = Path(cache_dir)
 
     key = (prefix, _key_for_url(key_url))
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
     keydir = _key_directory(cache_dir, key)
-    if not keydir.is_dir():
-        with _create_key_tmpdir(cache_dir, key) as tmpdir:
+    if not os.path.isdir(keydir):
+        # Parent directories are created as needed when fetching.
+        keytmpdir = _key_tmpdir(cache_dir, key)
+        with _create_key_tmpdir(keytmpdir) as tmpdir:
             if tmpdir:
                 fetchfunc(tmpdir)
                 _move_in_fetched_directory(keydir, tmpdir)
                 _add_url_file(keydir, key_url)
             else:  # Somebody else is currently fetching
                 _wait_for_dir_to_vanish(
-                    _key_tmpdir(cache_dir, key),
+                    keytmpdir,
                     timeout=timeout_for_fetch_elsewhere,
                 )
-                if not keydir.is_dir():
+                if not os.path.isdir(keydir):
                     raise Exception(
                         f"Fetching of directory {keydir} appears to have been completed elsewhere, but directory does not exist"
                     )
@@ -151,24 +181,33 @@ def permanent_directory(
 
 
 def _file_exists_and_is_fresh(file, ttl) -> bool:
-    if not file.is_file():
+    # A single stat() serves both the existence and the freshness check.
+    try:
+        st = os.stat(file)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    if not stat.S_ISREG(st.st_mode):
         return False
+    if ttl >= _FOREVER:
+        return True
     now = time.time()
-    mtime = file.stat().st_mtime
-    expiration = mtime + ttl
+    expiration = st.st_mtime + ttl
     # To avoid all possibilities of races, err on the side of considering the
     # file stale when the difference is less than 1 second.
     return now + 1.0 < expiration
 
 
 @contextmanager
-def _create_key_tmpdir(cache_dir, key):
-    tmpdir = _key_tmpdir(cache_dir, key)
-    tmpdir.parent.mkdir(parents=True, exist_ok=True)
-
+def _create_key_tmpdir(tmpdir):
     already_exists = False
     try:
-        tmpdir.mkdir()
+        try:
+            tmpdir.mkdir()
+        except FileNotFoundError:
+            # Parents do not exist (yet, or any more if the user deleted the
+            # cache directory).
+            tmpdir.parent.mkdir(parents=True, exist_ok=True)
+            tmpdir.mkdir()
     except FileExistsError:
         # Avoid yielding here, because that would mean doing stuff "while
         # handling an exception". If the stuff has an error (including
@@ -181,16 +220,26 @@ def _create_key_tmpdir(cache_dir, key):
         try:
             yield tmpdir
         finally:
-            if tmpdir.is_dir():
-                shutil.rmtree(tmpdir)
+            _remove_tmpdir(tmpdir)
+
+
+def _remove_tmpdir(tmpdir):
+    # Rename first, so that processes waiting for the directory to vanish are
+    # released at once rather than after removing a partially extracted JDK.
+    trash = tmpdir.with_name(f".{tmpdir.name}.{uuid.uuid4().hex}.trash")
+    try:
+        tmpdir.rename(trash)
+    except FileNotFoundError:  # Already moved into place
+        return
+    shutil.rmtree(trash)
 
 
 def _key_directory(cache_dir: Path, key) -> Path:
-    return cache_dir / "v0" / Path(*key)
+    return Path(os.path.join(cache_dir, "v0", *key))
 
 
 def _key_tmpdir(cache_dir: Path, key) -> Path:
-    return cache_dir / "v0" / Path("fetching", *key)
+    return Path(os.path.join(cache_dir, "v0", "fetching", *key))
 
 
 def _swap_in_fetched_file(target, tmpfile, timeout, progress=False):
@@ -209,13 +258,15 @@ def _swap_in_fetched_file(target, tmpfile, timeout, progress=False):
     # always results in the intended behavior.
     WINDOWS_ERROR_ACCESS_DENIED = 5
 
-    target.parent.mkdir(parents=True, exist_ok=True)
+    if sys.platform != "win32":
+        _replace_creating_parent(tmpfile, target)
+        return
     with _progress.indefinite(
         enabled=progress, text="File busy; waiting"
     ) as update_pbar:
         for wait_seconds in _backoff_seconds(0.001, 0.5, timeout):
             try:
-                tmpfile.replace(target)
+                _replace_creating_parent(tmpfile, target)
             except OSError as e:
                 if (
                     hasattr(e, "winerror")
@@ -231,21 +282,48 @@ def _swap_in_fetched_file(target, tmpfile, timeout, progress=False):
 
 
 def _move_in_fetched_directory(target, tmpdir):
-    target.parent.mkdir(parents=True, exist_ok=True)
-    tmpdir.replace(target)
+    _replace_creating_parent(tmpdir, target)
+
+
+def _replace_creating_parent(src, target):
+    try:
+        os.replace(src, target)
+    except FileNotFoundError:
+        # Create the parent only if missing, so that the common case costs no
+        # extra syscalls.
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src, target)
 
 
 def _add_url_file(keydir, key_url):
-    with open(keydir.parent / (keydir.name + ".url"), "w") as f:
+    url_file = keydir.parent / (keydir.name + ".url")
+    # When a file is re-fetched after its TTL expired, the URL is unchanged.
+    try:
+        with open(url_file) as f:
+            if f.read() == key_url:
+                return
+    except FileNotFoundError:
+        pass
+    with open(url_file, "w") as f:
         f.write(key_url)
 
 
 def _wait_for_dir_to_vanish(directory, timeout, progress=True):
+    # A fetch that has already been running for a while is unlikely to finish
+    # within milliseconds, so start polling at about 10% of its age. The age
+    # is measured from the last entry created in the fetching directory (for
+    # packages, this restarts during extraction).
+    try:
+        age = time.time() - os.stat(directory).st_mtime
+    except FileNotFoundError:
+        return
+    initial_interval = min(max(0.001, 0.1 * age), 0.5)
+
     with _progress.indefinite(
         enabled=progress, text="Already downloading; waiting"
     ) as update_pbar:
-        for wait_seconds in _backoff_seconds(0.001, 0.5, timeout):
-            if not directory.is_dir():
+        for wait_seconds in _backoff_seconds(initial_interval, 0.5, timeout):
+            if not os.path.isdir(directory):
                 return
             if wait_seconds < 0:
                 raise Exception(
@@ -69,6 +69,11 @@ def configure(**kwargs):
     return conf
 
 
+_VENDOR_PATTERN = re.compile(r"[a-z][a-z0-9-]*")
+_VERSION_PATTERN = re.compile(r"[0-9+.-]*")
+_X86_PATTERN = re.compile(r"i?[356]86")
+
+
 def _parse_vendor_version(spec):
     # Actually we don't fully parse here; we only disambiguate between vendor
     # and version when only one is given.
@@ -79,9 +84,9 @@ def _parse_vendor_version(spec):
         return tuple(parts)
     if len(spec) == 0:
         return "", ""
-    if re.fullmatch(r"[a-z][a-z0-9-]*", spec):
+    if _VENDOR_PATTERN.fullmatch(spec):
         return spec, ""
-    if re.fullmatch(r"[0-9+.-]*", spec):
+    if _VERSION_PATTERN.fullmatch(spec):
         return "", spec
     raise ValueError(f"Cannot parse JDK spec '{spec}'")
 
@@ -191,7 +196,7 @@ def _canonicalize_arch(arch):
         arch = "amd64"
     elif arch == "aarch64":
         arch = "arm64"
-    elif re.fullmatch(r"i?[356]86", arch):
+    elif _X86_PATTERN.fullmatch(arch):
         arch = "x86"
 
     return arch
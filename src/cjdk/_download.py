@@ -2,14 +2,14 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import hmac
 import tarfile
 import tempfile
 import zipfile
 from pathlib import Path
 from urllib.parse import urlparse
 
-import requests
-
 from . import _progress
 
 __all__ = [
@@ -18,18 +18,25 @@ __all__ = [
 ]
 
 
+# Each chunk goes through the progress bar, the file write, and any hashers in
+# Python, so larger chunks cut per-chunk overhead. But iter_content() blocks
+# until a full chunk has arrived, so the progress bar only moves once per
+# chunk; 256 KiB keeps it responsive on slow connections.
+_CHUNK_SIZE = 256 * 1024
+
+
 def download_and_extract(
     destdir,
     url,
     *,
-    checkfunc=None,
+    hashes=None,
     progress=True,
     _allow_insecure_for_testing=False,
 ):
     """
     Download zip or tgz archive and extract to destdir.
 
-    checkfunc is called on the archive temporary file.
+    hashes are checked against the archive as for download_file().
     """
     scheme = urlparse(url).scheme
     try:
@@ -45,13 +52,13 @@ def download_and_extract(
             f"Cannot handle compression type {ext}"
         ) from err
 
-    url = http + url.removeprefix(scheme)
+    url = url[len(ext) + 1 :]  # Drop "zip+" or "tgz+"
     with tempfile.TemporaryDirectory(prefix="cjdk-") as tempd:
         file = Path(tempd) / f"archive.{ext}"
         download_file(
             file,
             url,
-            checkfunc=checkfunc,
+            hashes=hashes,
             progress=progress,
             _allow_insecure_for_testing=_allow_insecure_for_testing,
         )
@@ -63,14 +70,23 @@ def download_file(
     url,
     *,
     checkfunc=None,
+    hashes=None,
     progress=False,
     _allow_insecure_for_testing=False,
 ):
     """
     Download any file at URL and place at dest.
 
+    hashes, if given, is a dict mapping hashlib algorithm names to expected
+    digests (bytes). The hashes are computed as the data is received,
+    and ValueError is raised if any does not match.
+
     checkfunc is called on dest.
     """
+    # Imported here because requests is slow to import and is not needed
+    # when everything is already cached (e.g. 'cjdk java-home' on a hit).
+    import requests
+
     if not _allow_insecure_for_testing:
         scheme = urlparse(url).scheme
         if scheme != "https":
@@ -82,14 +98,22 @@ def download_file(
     response.raise_for_status()
     total = response.headers.get("content-length", None)
     total = int(total) if total else None
+    # Hash while downloading, so that the file need not be read back.
+    hashers = {algo: hashlib.new(algo) for algo in (hashes or {})}
     with open(dest, "wb") as outfile:
         for chunk in _progress.data_transfer(
             total,
-            response.iter_content(chunk_size=16384),
+            response.iter_content(chunk_size=_CHUNK_SIZE),
             enabled=progress,
             text="Download",
         ):
             outfile.write(chunk)
+            for hasher in hashers.values():
+                hasher.update(chunk)
+
+    for algo, hasher in hashers.items():
+        if not hmac.compare_digest(hasher.digest(), hashes[algo]):
+            raise ValueError("Hash does not match")
 
     if checkfunc:
         checkfunc(dest)
@@ -2,7 +2,7 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
-import copy
+import dataclasses
 import json
 import re
 import warnings
@@ -16,6 +16,7 @@ __all__ = [
     "available_jdks",
     "resolve_jdk_version",
     "jdk_url",
+    "jdk_urls",
 ]
 
 
@@ -88,7 +89,19 @@ def jdk_url(
     """
     if exact_version is None:
         exact_version = resolve_jdk_version(index, conf)
-    return index[conf.os][conf.arch][f"jdk@{conf.vendor}"][exact_version]
+    return jdk_urls(index, conf)[exact_version]
+
+
+def jdk_urls(index: Index, conf: Configuration) -> Versions:
+    """
+    Find in index the URLs for all versions of the given vendor's JDK.
+
+    A dict mapping exact version to URL is returned.
+
+    Arguments:
+    index -- The JDK index (nested dict)
+    """
+    return index[conf.os][conf.arch][f"jdk@{conf.vendor}"]
 
 
 def _cached_index_path(conf: Configuration) -> Path:
@@ -96,8 +109,7 @@ def _cached_index_path(conf: Configuration) -> Path:
         # Ensure valid JSON.
         _read_index(path)
 
-    conf_no_progress = copy.deepcopy(conf)
-    conf_no_progress.progress = False
+    conf_no_progress = dataclasses.replace(conf, progress=False)
 
     return _install.install_file(
         _INDEX_KEY_PREFIX,
@@ -14,7 +14,7 @@ __all__ = [
 
 
 def install_file(
-    prefix, name, url, filename, conf, *, ttl, checkfunc=None
+    prefix, name, url, filename, conf, *, ttl, checkfunc=None, hashes=None
 ) -> Path:
     def fetch(dest):
         _print_progress_header(conf, name)
@@ -22,6 +22,7 @@ def install_file(
             dest,
             url,
             checkfunc=checkfunc,
+            hashes=hashes,
             progress=conf.progress,
             _allow_insecure_for_testing=conf._allow_insecure_for_testing,
         )
@@ -36,13 +37,13 @@ def install_file(
     )
 
 
-def install_dir(prefix, name, url, conf, *, checkfunc=None) -> Path:
+def install_dir(prefix, name, url, conf, *, hashes=None) -> Path:
     def fetch(destdir):
         _print_progress_header(conf, name)
         _download.download_and_extract(
             destdir,
             url,
-            checkfunc=checkfunc,
+            hashes=hashes,
             progress=conf.progress,
             _allow_insecure_for_testing=conf._allow_insecure_for_testing,
         )
@@ -7,8 +7,6 @@ import sys
 import time
 from contextlib import contextmanager
 
-import progressbar
-
 __all__ = [
     "indefinite",
     "data_transfer",
@@ -28,9 +26,12 @@ def indefinite(*, enabled, text):
     The value of the context manager is a callable which should be called every
     iteration with no arguments.
     """
-    enabled = _bar_enabled(enabled)
-    barclass = progressbar.ProgressBar if enabled else progressbar.NullBar
-    with barclass(
+    if not _bar_enabled(enabled):
+        yield _no_op
+        return
+    import progressbar
+
+    with progressbar.ProgressBar(
         max_value=progressbar.UnknownLength, prefix=f"{text} "
     ) as pbar:
         yield lambda: pbar.update()
@@ -46,12 +47,17 @@ def data_transfer(total_bytes, iter, *, enabled, text):
     enabled -- Whether to show progress bar (bool).
     text -- Label text (str).
     """
-    enabled = _bar_enabled(enabled)
-    barclass = progressbar.DataTransferBar if enabled else progressbar.NullBar
+    if not _bar_enabled(enabled):
+        yield from iter
+        return
+    import progressbar
+
     size = 0
     if total_bytes is None:
         total_bytes = progressbar.UnknownLength
-    with barclass(max_value=total_bytes, prefix=f"{text} ") as pbar:
+    with progressbar.DataTransferBar(
+        max_value=total_bytes, prefix=f"{text} "
+    ) as pbar:
         pbar.start()
         for chunk in iter:
             yield chunk
@@ -69,17 +75,24 @@ def iterate(iter, *, enabled, text, total=None):
     text -- Label text (str).
     total -- Known total iteration count (int) or None.
     """
-    enabled = _bar_enabled(enabled)
-    barclass = progressbar.ProgressBar if enabled else progressbar.NullBar
+    if not _bar_enabled(enabled):
+        yield from iter
+        return
+    import progressbar
+
     if total is None:
         if hasattr(iter, "__len__"):
             total = len(iter)
         else:
             total = progressbar.UnknownLength
-    bar = barclass(prefix=f"{text} ", max_value=total)
+    bar = progressbar.ProgressBar(prefix=f"{text} ", max_value=total)
     yield from bar(iter)
 
 
+def _no_op():
+    pass
+
+
 def _bar_enabled(enabled):
     if os.environ.get("CJDK_HIDE_PROGRESS_BARS", "0").lower() in (
         "1",
@@ -18,7 +18,13 @@ __all__ = [
 ]
 
 
-_PORT = int(os.environ.get("CJDK_TEST_PORT", "5000"))
+def _xdist_worker_index():
+    # Give each pytest-xdist worker ("gw0", "gw1", ...) its own port.
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    return int(worker.removeprefix("gw"))
+
+
+_PORT = int(os.environ.get("CJDK_TEST_PORT", "5000")) + _xdist_worker_index()
 
 
 def port():
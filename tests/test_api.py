@@ -109,50 +109,79 @@ def test_java_env(tmp_path):
         assert os.environ.get("PATH", None) == old_path
 
 
-def test_make_hash_checker(tmp_path):
-    sha1_empty_string = "da39a3ee5e6b4b0d3255bfef95601890afd80709"
-    sha256_empty_string = (
-        "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
-    )
-    sha512_empty_string = "cf83e1357eefb8bdf1542850d66d8007d620e4050b5715dc83f4a921d36ce9ce47d0d13c5d85f2b0ff8318d2877eec2f63b931bd47417a81a538327af927da3e"
+def test_java_env_vars(tmp_path, monkeypatch):
+    home = tmp_path / "jdk"
+    monkeypatch.setattr(_api, "java_home", lambda **kwargs: home)
+    bindir = str(home / "bin")
 
-    empty_file = tmp_path / "empty"
-    empty_file.touch()
+    monkeypatch.delenv("PATH", raising=False)
+    with _api.java_env():
+        assert os.environ["JAVA_HOME"] == str(home)
+        assert os.environ["PATH"] == bindir
+    assert "PATH" not in os.environ
 
-    check = _api._make_hash_checker({})
-    check(empty_file)
+    # An empty PATH must not turn into a trailing empty entry
+    monkeypatch.setenv("PATH", "")
+    with _api.java_env():
+        assert os.environ["PATH"] == bindir
+    assert os.environ["PATH"] == ""
 
-    check = _api._make_hash_checker(
-        dict(
-            sha1=sha1_empty_string,
-            sha256=sha256_empty_string,
-            sha512=sha512_empty_string,
-        )
-    )
-    check(empty_file)
+    old_path = os.pathsep.join(["a", "b"])
+    monkeypatch.setenv("PATH", old_path)
+    with _api.java_env():
+        assert os.environ["PATH"] == bindir + os.pathsep + old_path
+    assert os.environ["PATH"] == old_path
+
+    with _api.java_env(add_bin=False):
+        assert os.environ["JAVA_HOME"] == str(home)
+        assert os.environ["PATH"] == old_path
+    assert os.environ["PATH"] == old_path
+
+    # As used directly by 'cjdk exec'
+    assert _api._java_env_vars(home, add_bin=False) == {"JAVA_HOME": str(home)}
+    assert _api._java_env_vars(home, add_bin=True) == {
+        "JAVA_HOME": str(home),
+        "PATH": bindir + os.pathsep + old_path,
+    }
 
-    check = _api._make_hash_checker(dict(sha1=sha1_empty_string))
 
-    not_empty_file = tmp_path / "not_empty"
-    with open(not_empty_file, "w") as fp:
-        fp.write("hello")
-    with pytest.raises(ValueError):
-        check(not_empty_file)
+def test_pop_hashes():
+    kwargs = dict(sha1="ABCD", sha256=None, sha512="0f", os="linux")
+    assert _api._pop_hashes(kwargs) == {"sha1": b"\xab\xcd", "sha512": b"\x0f"}
+    assert kwargs == {"os": "linux"}
 
+    assert _api._pop_hashes({}) == {}
 
-def test_env_var_set():
-    f = _api._env_var_set
+    with pytest.raises(ValueError, match="Invalid sha256 hash: 'xyz'"):
+        _api._pop_hashes(dict(sha256="xyz"))
+
+
+def test_env_vars_set():
+    f = _api._env_vars_set
 
     os.environ["CJDK_TEST_ENV_VAR"] = "x"
-    with f("CJDK_TEST_ENV_VAR", "testvalue"):
+    with f({"CJDK_TEST_ENV_VAR": "testvalue"}):
         assert os.environ["CJDK_TEST_ENV_VAR"] == "testvalue"
     assert os.environ["CJDK_TEST_ENV_VAR"] == "x"
 
+    os.environ["CJDK_TEST_ENV_VAR"] = ""
+    with f({"CJDK_TEST_ENV_VAR": "testvalue"}):
+        assert os.environ["CJDK_TEST_ENV_VAR"] == "testvalue"
+    assert os.environ["CJDK_TEST_ENV_VAR"] == ""
+
     del os.environ["CJDK_TEST_ENV_VAR"]
-    with f("CJDK_TEST_ENV_VAR", "testvalue"):
+    with f({"CJDK_TEST_ENV_VAR": "testvalue"}):
         assert os.environ["CJDK_TEST_ENV_VAR"] == "testvalue"
     assert "CJDK_TEST_ENV_VAR" not in os.environ
 
+    os.environ["CJDK_TEST_ENV_VAR"] = "x"
+    with f({"CJDK_TEST_ENV_VAR": "a", "CJDK_TEST_ENV_VAR_2": "b"}):
+        assert os.environ["CJDK_TEST_ENV_VAR"] == "a"
+        assert os.environ["CJDK_TEST_ENV_VAR_2"] == "b"
+    assert os.environ["CJDK_TEST_ENV_VAR"] == "x"
+    assert "CJDK_TEST_ENV_VAR_2" not in os.environ
+    del os.environ["CJDK_TEST_ENV_VAR"]
+
 
 def test_get_vendors():
     vendors = _api._get_vendors()
@@ -186,3 +215,62 @@ def test_get_jdks():
     assert zulu_jdks is not None
     assert len(set(zulu_jdks))
     assert all(jdk.startswith("zulu:") for jdk in zulu_jdks)
+
+
+def test_get_jdks_from_cached_index(tmp_path):
+    # Pretend cache (= tmp_path) is pre-populated with an index and one JDK
+    index_url = "http://127.0.0.1:1/index.json"
+    index_dir = (
+        tmp_path
+        / "v0"
+        / _index._INDEX_KEY_PREFIX
+        / _cache._key_for_url(index_url)
+    )
+    index_dir.mkdir(parents=True)
+    with open(index_dir / _index._INDEX_FILENAME, "w") as f:
+        json.dump(
+            {
+                "linux": {
+                    "amd64": {
+                        "jdk@adoptium": {
+                            "17.0.10": "zip+https://x.com/a17010.zip",
+                            "17.0.2": "zip+https://x.com/a1702.zip",
+                            "11.0.2": "zip+https://x.com/a1102.zip",
+                        },
+                        "jdk@zulu": {"8.0.1": "zip+https://x.com/z801.zip"},
+                    }
+                },
+                "darwin": {
+                    "arm64": {
+                        "jdk@corretto": {"17": "zip+https://x.com/c.zip"}
+                    }
+                },
+            },
+            f,
+        )
+    jdk_dir = (
+        tmp_path
+        / "v0"
+        / _jdk._JDK_KEY_PREFIX
+        / _cache._key_for_url("zip+https://x.com/a1702.zip")
+    )
+    jdk_dir.mkdir(parents=True)
+
+    kwargs = dict(
+        os="linux", arch="amd64", cache_dir=tmp_path, index_url=index_url
+    )
+    assert _api._get_vendors(**kwargs) == {"adoptium", "corretto", "zulu"}
+    assert _api._get_jdks(cached_only=False, **kwargs) == [
+        "adoptium:11.0.2",
+        "adoptium:17.0.2",
+        "adoptium:17.0.10",
+        "zulu:8.0.1",
+    ]
+    assert _api._get_jdks(**kwargs) == ["adoptium:17.0.2"]
+    assert _api._get_jdks(jdk=":17", cached_only=False, **kwargs) == [
+        "adoptium:17.0.2",
+        "adoptium:17.0.10",
+    ]
+    assert _api._get_jdks(vendor="zulu", cached_only=False, **kwargs) == [
+        "zulu:8.0.1"
+    ]
@@ -2,6 +2,7 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import os
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor
@@ -19,6 +20,9 @@ def test_key_for_url():
     assert key == key.lower()
     assert f("https://x.com/a%2Bb/c.json") == f("http://x.com/a+b/c.json")
     assert f("https://x.com/a%2Bb/c.json") == f("https://x.com/a%2bb/c.json")
+    assert f("https://x.com/a%2fb/c.json") == f("https://x.com/a%2Fb/c.json")
+    assert f("https://x.com/a%2Fb/c.json") != f("https://x.com/a/b/c.json")
+    assert f("https://x.com/a%00b/c.json") != f("https://x.com/a/b/c.json")
 
 
 def test_file_exists_and_is_fresh(tmp_path):
@@ -33,6 +37,18 @@ def test_file_exists_and_is_fresh(tmp_path):
     assert f(path, ttl=3)
 
 
+def test_remove_tmpdir(tmp_path):
+    tmpdir = tmp_path / "fetching" / "key"
+    (tmpdir / "a").mkdir(parents=True)
+    (tmpdir / "a" / "b").touch()
+    _cache._remove_tmpdir(tmpdir)
+    assert not tmpdir.exists()
+    assert not any(tmpdir.parent.iterdir())
+
+    # Already gone
+    _cache._remove_tmpdir(tmpdir)
+
+
 def test_key_directory():
     f = _cache._key_directory
     assert f(Path("a"), ("b",)) == Path("a/v0/b")
@@ -89,6 +105,19 @@ def test_move_in_fetched_directory(tmp_path):
     assert not src.is_dir()
 
 
+def test_add_url_file(tmp_path):
+    f = _cache._add_url_file
+    keydir = tmp_path / "key"
+    url_file = tmp_path / "key.url"
+    f(keydir, "https://x.com/a")
+    assert url_file.read_text() == "https://x.com/a"
+    mtime = url_file.stat().st_mtime_ns
+    f(keydir, "https://x.com/a")
+    assert url_file.stat().st_mtime_ns == mtime
+    f(keydir, "https://x.com/b")
+    assert url_file.read_text() == "https://x.com/b"
+
+
 def test_wait_for_dir_to_vanish(tmp_path):
     path = tmp_path / "testdir"
     path.mkdir()
@@ -106,6 +135,30 @@ def test_wait_for_dir_to_vanish(tmp_path):
     with pytest.raises(Exception):
         _cache._wait_for_dir_to_vanish(path, 0.1)
 
+    # Already gone
+    path.rmdir()
+    _cache._wait_for_dir_to_vanish(path, 0)
+
+
+def test_wait_for_dir_to_vanish_initial_interval(tmp_path, monkeypatch):
+    path = tmp_path / "testdir"
+    path.mkdir()
+    initial_intervals = []
+    backoff_seconds = _cache._backoff_seconds
+
+    def recording_backoff_seconds(initial_interval, *args, **kwargs):
+        initial_intervals.append(initial_interval)
+        return backoff_seconds(initial_interval, *args, **kwargs)
+
+    monkeypatch.setattr(_cache, "_backoff_seconds", recording_backoff_seconds)
+
+    now = time.time()
+    for age, expected in [(0, 0.001), (2, 0.2), (100, 0.5)]:
+        os.utime(path, (now - age, now - age))
+        with pytest.raises(Exception):
+            _cache._wait_for_dir_to_vanish(path, 0)
+        assert initial_intervals.pop() == pytest.approx(expected, abs=0.01)
+
 
 def test_backoff_seconds():
     f = _cache._backoff_seconds
@@ -2,6 +2,7 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import shutil
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor
@@ -54,6 +55,23 @@ def test_atomic_file_cached(tmp_path):
     assert (keydir / "testfile").stat().st_mtime == mtime
 
 
+def test_atomic_file_cache_dir_deleted(tmp_path):
+    # The user may delete the cache directory at any time, including between
+    # calls in a long-running process.
+    def fetch(path):
+        path.touch()
+
+    cache_dir = tmp_path / "cache"
+    atomic_file(
+        "p", _TEST_URL, "testfile", fetch, cache_dir=cache_dir, ttl=2**63
+    )
+    shutil.rmtree(cache_dir)
+    cached = atomic_file(
+        "p", _TEST_URL, "testfile", fetch, cache_dir=cache_dir, ttl=2**63
+    )
+    assert cached.is_file()
+
+
 def test_atomic_file_expired(tmp_path):
     new_mtime = 0
 
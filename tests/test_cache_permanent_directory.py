@@ -2,6 +2,7 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import shutil
 import time
 from concurrent.futures import ThreadPoolExecutor
 from queue import SimpleQueue
@@ -31,6 +32,19 @@ def test_permanent_directory_uncached(tmp_path):
         assert f.read() == _TEST_URL
 
 
+def test_permanent_directory_cache_dir_deleted(tmp_path):
+    # The user may delete the cache directory at any time, including between
+    # calls in a long-running process.
+    def fetch(path):
+        (path / "testfile").touch()
+
+    cache_dir = tmp_path / "cache"
+    permanent_directory("p", _TEST_URL, fetch, cache_dir=cache_dir)
+    shutil.rmtree(cache_dir)
+    cached = permanent_directory("p", _TEST_URL, fetch, cache_dir=cache_dir)
+    assert (cached / "testfile").is_file()
+
+
 def test_permanent_directory_cached(tmp_path):
     def fetch(path):
         assert False
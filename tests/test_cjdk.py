@@ -3,6 +3,8 @@
 # SPDX-License-Identifier: MIT
 
 import re
+import subprocess
+import sys
 
 import cjdk
 
@@ -26,3 +28,15 @@ def test_version():
     assert re.fullmatch(n, parts[0])
     assert re.fullmatch(n, parts[1])
     assert re.fullmatch(n, parts[2])
+
+
+def test_lazy_import():
+    # Importing cjdk should not import the API implementation (and its
+    # dependencies) until an API function is accessed.
+    code = (
+        "import sys, cjdk; "
+        "assert 'cjdk._api' not in sys.modules; "
+        "assert callable(cjdk.java_home); "
+        "assert 'cjdk._api' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
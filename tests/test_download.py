@@ -2,6 +2,7 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import hashlib
 import stat
 import sys
 import tarfile
@@ -20,8 +21,7 @@ def test_download_and_extract(tmp_path):
     with open(zip, "rb") as f:
         zipdata = f.read()
 
-    def check(filepath):
-        assert filepath.name.endswith(".zip")
+    hashes = {"sha256": hashlib.sha256(zipdata).digest()}
 
     destdir = tmp_path / "destdir"
     destdir.mkdir()
@@ -31,12 +31,29 @@ def test_download_and_extract(tmp_path):
         _download.download_and_extract(
             destdir,
             "zip+" + server.url("/test.zip"),
-            checkfunc=check,
+            hashes=hashes,
             _allow_insecure_for_testing=True,
         )
 
     assert (destdir / "testfile").is_file()
 
+    destdir2 = tmp_path / "destdir2"
+    destdir2.mkdir()
+    with (
+        mock_server.start(
+            file_endpoint="/test.zip", file_data=zipdata
+        ) as server,
+        pytest.raises(ValueError),
+    ):
+        _download.download_and_extract(
+            destdir2,
+            "zip+" + server.url("/test.zip"),
+            hashes={"sha256": hashlib.sha256(b"other").digest()},
+            _allow_insecure_for_testing=True,
+        )
+
+    assert not (destdir2 / "testfile").exists()
+
 
 def test_download_file(tmp_path):
     size = 100 * 1024 * 1024
@@ -74,6 +91,32 @@ def test_download_file(tmp_path):
         )
 
 
+def test_download_file_hashes(tmp_path):
+    destfile = tmp_path / "testfile"
+    data = b"hello"
+    hashes = {
+        algo: hashlib.new(algo, data).digest()
+        for algo in ("sha1", "sha256", "sha512")
+    }
+
+    with mock_server.start(file_data=data) as server:
+        _download.download_file(
+            destfile,
+            server.url("/file.txt"),
+            hashes=hashes,
+            _allow_insecure_for_testing=True,
+        )
+        assert destfile.read_bytes() == data
+
+        with pytest.raises(ValueError):
+            _download.download_file(
+                destfile,
+                server.url("/file.txt"),
+                hashes=dict(hashes, sha256=hashlib.sha256().digest()),
+                _allow_insecure_for_testing=True,
+            )
+
+
 def test_extract_zip(tmp_path):
     originals = tmp_path / "original"
     originals.mkdir()
@@ -108,6 +108,25 @@ def test_jdk_url():
     )
 
 
+def test_jdk_urls():
+    index = {
+        "linux": {
+            "amd64": {
+                "jdk@adoptium": {
+                    "17.0.1": "tgz+https://example.com/a/b/c.tgz",
+                    "11.0.2": "tgz+https://example.com/a/b/d.tgz",
+                }
+            }
+        }
+    }
+    assert _index.jdk_urls(
+        index, configure(os="linux", arch="amd64", vendor="adoptium")
+    ) == {
+        "17.0.1": "tgz+https://example.com/a/b/c.tgz",
+        "11.0.2": "tgz+https://example.com/a/b/d.tgz",
+    }
+
+
 def test_cached_index_path(tmp_path):
     with mock_server.start(
         endpoint="/index.json", data={"hello": "world"}
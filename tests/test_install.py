@@ -2,9 +2,11 @@
 # Copyright 2022 Board of Regents of the University of Wisconsin System
 # SPDX-License-Identifier: MIT
 
+import hashlib
 import zipfile
 
 import mock_server
+import pytest
 from cjdk import _conf, _install
 
 
@@ -62,13 +64,25 @@ def test_install_dir(tmp_path):
     with open(zip, "rb") as f:
         zipdata = f.read()
 
-    def check(filepath):
-        with open(filepath, "rb") as fp:
-            assert fp.read() == zipdata
+    hashes = {"sha256": hashlib.sha256(zipdata).digest()}
+    bad_hashes = {"sha256": hashlib.sha256(b"other").digest()}
 
     with mock_server.start(
         file_endpoint="/test.zip", file_data=zipdata
     ) as server:
+        with pytest.raises(ValueError):
+            _install.install_dir(
+                "testprefix",
+                "testname",
+                "zip+" + server.url("/test.zip"),
+                _conf.configure(
+                    cache_dir=tmp_path / "cache",
+                    _allow_insecure_for_testing=True,
+                ),
+                hashes=bad_hashes,
+            )
+        assert not (tmp_path / "cache" / "v0" / "testprefix").exists()
+
         cacheddir = _install.install_dir(
             "testprefix",
             "testname",
@@ -76,22 +90,20 @@ def test_install_dir(tmp_path):
             _conf.configure(
                 cache_dir=tmp_path / "cache", _allow_insecure_for_testing=True
             ),
-            checkfunc=check,
+            hashes=hashes,
         )
 
     assert (cacheddir / "testfile").is_file()
     assert cacheddir.parent.samefile(tmp_path / "cache" / "v0" / "testprefix")
 
-    def check_not_called(filepath):
-        assert False
-
+    # Hashes are only checked on download
     with mock_server.start() as server:
         cacheddir2 = _install.install_dir(
             "testprefix",
             "testname",
             "zip+" + server.url("/test.zip"),
             _conf.configure(cache_dir=tmp_path / "cache"),
-            checkfunc=check_not_called,
+            hashes=bad_hashes,
         )
 
     assert cacheddir2 == cacheddir